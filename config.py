@@ -12,6 +12,7 @@ class Config:
     MARKET_CAP_THRESHOLD = float(os.getenv('MARKET_CAP_THRESHOLD', 200_000_000))
     UPDATE_INTERVAL_MINUTES = int(os.getenv('UPDATE_INTERVAL_MINUTES', 15))
     VOLUME_PERIODS = int(os.getenv('VOLUME_PERIODS', 20))
+    CANDLE_FETCH_WORKERS = int(os.getenv('CANDLE_FETCH_WORKERS', 8))
     
     # EMA-based momentum filtering options
     EMA_PERIODS = int(os.getenv('EMA_PERIODS', 21))
@@ -19,14 +20,17 @@ class Config:
     EMA_SLOPE_FILTER_ENABLED = os.getenv('EMA_SLOPE_FILTER_ENABLED', 'true').lower() == 'true'
     
     # Strict list configuration
-    @property
-    def STRICT_LIST(self):
+    STRICT_LIST_FILE = 'strict_list.json'
+    STRICT_LIST_SET = frozenset()  # Loaded once at startup by validate()
+    
+    @classmethod
+    def load_strict_list(cls):
         """Get strict list of tokens from JSON file"""
         try:
-            with open('strict_list.json', 'r') as f:
-                return json.load(f)
+            with open(cls.STRICT_LIST_FILE, 'r') as f:
+                return frozenset(json.load(f))
         except (FileNotFoundError, json.JSONDecodeError):
-            return []
+            return frozenset()
     
     STRICT_LIST_ENABLED = os.getenv('STRICT_LIST_ENABLED', 'true').lower() == 'true'
     
@@ -41,10 +45,11 @@ class Config:
         assert cls.UPDATE_INTERVAL_MINUTES > 0, "UPDATE_INTERVAL_MINUTES must be positive"
         assert cls.VOLUME_PERIODS > 1, "VOLUME_PERIODS must be > 1"
         assert cls.EMA_PERIODS > 0, "EMA_PERIODS must be positive"
+        assert cls.CANDLE_FETCH_WORKERS > 0, "CANDLE_FETCH_WORKERS must be positive"
         
         # Validate strict list
-        config_instance = cls()
-        strict_list = config_instance.STRICT_LIST
+        cls.STRICT_LIST_SET = cls.load_strict_list()
+        strict_list = cls.STRICT_LIST_SET
         if cls.STRICT_LIST_ENABLED and not strict_list:
             print("⚠️  Warning: STRICT_LIST_ENABLED=true but strict_list.json is empty")
         elif strict_list:
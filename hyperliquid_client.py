@@ -1,77 +1,145 @@
-import requests
+import httpx
+import numpy as np
+import orjson
+import random
+import threading
 import time
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+@dataclass
+class TokenTable:
+    """Token universe as parallel arrays (one row per token)"""
+    names: np.ndarray
+    volume_24h: np.ndarray
+    price: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def select(self, rows) -> "TokenTable":
+        """Return the subset of rows given by a boolean mask or index array"""
+        return TokenTable(self.names[rows], self.volume_24h[rows], self.price[rows])
+    
+    def row(self, i: int) -> Dict:
+        """Get a single token as a {name, volume_24h, price} dict"""
+        return {
+            "name": str(self.names[i]),
+            "volume_24h": float(self.volume_24h[i]),
+            "price": float(self.price[i])
+        }
 
 class HyperliquidClient:
     BASE_URL = "https://api.hyperliquid.xyz"
-    RATE_LIMIT_DELAY = 0.05  # 50ms between requests to stay under 1200/min
+    RATE_LIMIT_WEIGHT_PER_MINUTE = 1200  # Hyperliquid per-IP request weight budget
+    # Request weights by info type (per Hyperliquid docs; unlisted info requests weigh 20)
+    REQUEST_WEIGHTS = {"candleSnapshot": 20, "meta": 20, "metaAndAssetCtxs": 20, "allMids": 2}
+    DEFAULT_REQUEST_WEIGHT = 20
+    MAX_RETRY_DELAY = 30  # Seconds, cap for rate-limit / server-error backoff
     
     def __init__(self):
-        self.session = requests.Session()
-        self.last_request_time = 0
+        # HTTP/2 client: concurrent fetch threads multiplex over one pooled connection
+        self.session = httpx.Client(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            headers={"Content-Type": "application/json"}  # Bodies are pre-encoded with orjson
+        )
+        self._bucket_tokens = float(self.RATE_LIMIT_WEIGHT_PER_MINUTE)
+        self._last_refill = time.monotonic()
+        self._rate_lock = threading.Lock()
     
-    def _rate_limit(self):
-        """Ensure rate limiting compliance"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.RATE_LIMIT_DELAY:
-            time.sleep(self.RATE_LIMIT_DELAY - elapsed)
-        self.last_request_time = time.time()
+    def _rate_limit(self, weight: int):
+        """Ensure rate limiting compliance (thread-safe token bucket)"""
+        refill_rate = self.RATE_LIMIT_WEIGHT_PER_MINUTE / 60  # Weight per second
+        
+        with self._rate_lock:
+            now = time.monotonic()
+            self._bucket_tokens = min(self.RATE_LIMIT_WEIGHT_PER_MINUTE,
+                                      self._bucket_tokens + (now - self._last_refill) * refill_rate)
+            self._last_refill = now
+            
+            if self._bucket_tokens < weight:
+                # Hold the lock while waiting so queued requests are served in order
+                time.sleep((weight - self._bucket_tokens) / refill_rate)
+                now = time.monotonic()
+                self._bucket_tokens += (now - self._last_refill) * refill_rate
+                self._last_refill = now
+            
+            self._bucket_tokens -= weight
     
-    def _post(self, endpoint: str, data: dict, retries: int = 1) -> Optional[dict]:
+    def _post(self, endpoint: str, data: dict, retries: int = 3) -> Optional[dict]:
         """Make POST request with rate limiting and retry logic"""
-        self._rate_limit()
+        weight = self.REQUEST_WEIGHTS.get(data.get("type"), self.DEFAULT_REQUEST_WEIGHT)
         
         for attempt in range(retries + 1):
+            self._rate_limit(weight)  # Every attempt counts against the budget
             try:
-                response = self.session.post(f"{self.BASE_URL}/{endpoint}", json=data, timeout=10)
+                response = self.session.post(f"{self.BASE_URL}/{endpoint}", content=orjson.dumps(data))
                 response.raise_for_status()
-                return response.json()
+                return orjson.loads(response.content)
             except Exception as e:
                 if attempt == retries:
                     print(f"❌ API request failed after {retries + 1} attempts: {e}")
                     return None
-                time.sleep(1)  # Brief pause before retry
+                time.sleep(self._retry_delay(e, attempt))
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying a failed request"""
+        status = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+        
+        if status == 429 or (status is not None and status >= 500):
+            # Rate limited or server error: honor Retry-After, else exponential backoff with jitter
+            retry_after = error.response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(self.MAX_RETRY_DELAY, int(retry_after))
+            return min(self.MAX_RETRY_DELAY, 2 ** (attempt + 1)) + random.uniform(0, 0.5)
+        
+        return 1  # Brief pause before retry
+    
+    def get_meta(self) -> Optional[Dict]:
+        """Get perpetuals universe metadata"""
+        return self._post("info", {"type": "meta"})
     
-    def get_universe_and_volumes(self) -> Optional[List[Dict]]:
+    def get_universe_and_volumes(self) -> Optional[TokenTable]:
         """Get token universe with volume data"""
         data = self._post("info", {"type": "metaAndAssetCtxs"})
         if not data or len(data) != 2:
             return None
         
         universe, asset_contexts = data
-        tokens = []
+        universe = universe.get("universe", [])[:len(asset_contexts)]
         
-        for i, token_info in enumerate(universe.get("universe", [])):
-            if i >= len(asset_contexts):
-                continue
-            
+        names = []
+        seen = set()
+        volume_24h = np.empty(len(universe), dtype=np.float64)
+        price = np.empty(len(universe), dtype=np.float64)
+        
+        for token_info, asset_ctx in zip(universe, asset_contexts):
             name = token_info.get("name")
             if not name or name in ["BTC", "ETH"]:  # Exclude BTC/ETH as specified
                 continue
+            if name in seen:
+                continue  # Keep names unique; VolumeAnalyzer.update_volumes needs distinct tokens
+            seen.add(name)
             
-            asset_ctx = asset_contexts[i]
-            volume_24h = float(asset_ctx.get("dayNtlVlm", 0))
-            price = float(asset_ctx.get("markPx", 0))
-            
-            tokens.append({
-                "name": name,
-                "volume_24h": volume_24h,
-                "price": price
-            })
+            volume_24h[len(names)] = float(asset_ctx.get("dayNtlVlm", 0))
+            price[len(names)] = float(asset_ctx.get("markPx", 0))
+            names.append(name)
         
-        return tokens
+        count = len(names)
+        return TokenTable(np.array(names, dtype=str), volume_24h[:count], price[:count])
     
-    def get_1h_candles(self, coin: str, num_candles: int = 25) -> Optional[List[Dict]]:
-        """Get 1H candle data for EMA calculation
+    def get_1h_closes(self, coin: str, num_candles: int = 25) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Get 1H candle timestamps and closes for EMA calculation
         
         Args:
             coin: Token symbol (e.g., "SOL")
             num_candles: Number of recent 1H candles to fetch (default: 25 for 21 EMA + buffer)
         
         Returns:
-            List of candle dictionaries with {close, volume, timestamp} or None if failed
+            (timestamps, closes) arrays, oldest first, or None if failed
         """
-        # Calculate time range (num_candles hours ago to now)
         end_time = int(time.time() * 1000)  # Current time in ms
         start_time = end_time - (num_candles * 60 * 60 * 1000)  # num_candles hours ago
         
@@ -89,19 +157,23 @@ class HyperliquidClient:
         if not data:
             return None
         
-        # Parse candle data
-        candles = []
+        # Parse (timestamp, close) pairs
+        pairs = []
         for candle in data:
             try:
-                candles.append({
-                    "close": float(candle["c"]),
-                    "volume": float(candle["v"]),
-                    "timestamp": int(candle["t"]),
-                    "open": float(candle["o"]),
-                    "high": float(candle["h"]),
-                    "low": float(candle["l"])
-                })
+                pairs.append((int(candle["t"]), float(candle["c"])))
             except (KeyError, ValueError, TypeError):
                 continue  # Skip malformed candles
         
-        return candles if candles else None 
\ No newline at end of file
+        if not pairs:
+            return None
+        
+        timestamps = np.fromiter((t for t, _ in pairs), dtype=np.int64, count=len(pairs))
+        closes = np.fromiter((c for _, c in pairs), dtype=np.float64, count=len(pairs))
+        
+        # Hyperliquid returns candles oldest first; only sort if that ever stops holding
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, closes = timestamps[order], closes[order]
+        
+        return timestamps, closes
@@ -7,6 +7,8 @@ Monitors perpetual futures volume for abnormal spikes with EMA momentum filterin
 import time
 import signal
 import sys
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from config import Config
@@ -19,6 +21,10 @@ class VolumeSpikeBot:
     def __init__(self):
         Config.validate()
         
+        # Strict list is loaded once by validate(); restart to pick up changes
+        self._strict_list = Config.STRICT_LIST_SET
+        self._strict_names = np.array(sorted(self._strict_list), dtype=str)
+        
         self.client = HyperliquidClient()
         self.volume_analyzer = VolumeAnalyzer(periods=Config.VOLUME_PERIODS)
         self.price_analyzer = PriceAnalyzer(ema_periods=Config.EMA_PERIODS)
@@ -36,69 +42,76 @@ class VolumeSpikeBot:
     
     def _filter_tokens(self, tokens):
         """Filter tokens based on strict list, volume and price criteria"""
-        filtered = []
-        config = Config()
-        strict_list = config.STRICT_LIST
-        
-        for token in tokens:
-            # Apply strict list filter if enabled
-            if Config.STRICT_LIST_ENABLED:
-                if token['name'] not in strict_list:
-                    continue  # Skip tokens not in strict list
-            
-            # Skip if volume is 0 or very low (likely delisted/inactive)
-            if token['volume_24h'] < 1000:  # $1k minimum volume
-                continue
-            
-            # Basic sanity checks
-            if token['price'] <= 0:
-                continue
-                
-            filtered.append(token)
+        # Skip if volume is 0 or very low (likely delisted/inactive), $1k minimum volume,
+        # and apply basic price sanity check
+        mask = (tokens.volume_24h >= 1000) & (tokens.price > 0)
         
-        return filtered
-    
-    def _check_volume_and_momentum_spike(self, token):
-        """Check if token has both volume spike and positive momentum"""
-        name = token['name']
-        volume = token['volume_24h']
+        # Apply strict list filter if enabled
+        if Config.STRICT_LIST_ENABLED:
+            mask &= np.isin(tokens.names, self._strict_names)
         
-        # STEP 1: Update volume history and check volume spike
-        self.volume_analyzer.update_volume(name, volume)
+        return tokens.select(mask)
+    
+    def _find_volume_spikes(self, tokens):
+        """Update volume history for all tokens and return (token, volume stats) for spikes"""
+        names = tokens.names.tolist()
+        volumes = tokens.volume_24h
         
-        # Skip if insufficient volume data
-        if not self.volume_analyzer.has_sufficient_data(name):
-            return False
+        self.volume_analyzer.update_volumes(names, volumes)
         
-        # Calculate volume statistics
-        volume_stats = self.volume_analyzer.calculate_stats(name, volume)
-        if not volume_stats:
-            return False
+        # Calculate volume statistics (tokens with insufficient data are omitted)
+        stats_by_name = self.volume_analyzer.calculate_stats_batch(names, volumes)
         
         # Check volume spike thresholds
-        volume_spike = (volume_stats['sigma_deviation'] >= Config.SIGMA_THRESHOLD and 
-                       volume_stats['z_score'] >= Config.Z_SCORE_THRESHOLD)
-        
-        if not volume_spike:
-            return False  # No volume spike, skip momentum check
+        spikes = []
+        for i, name in enumerate(names):
+            volume_stats = stats_by_name.get(name)
+            if (volume_stats and
+                    volume_stats['sigma_deviation'] >= Config.SIGMA_THRESHOLD and 
+                    volume_stats['z_score'] >= Config.Z_SCORE_THRESHOLD):
+                spikes.append((tokens.row(i), volume_stats))
+        return spikes
+    
+    def _fetch_candles(self, names):
+        """Fetch 1H candles for several tokens concurrently"""
+        with ThreadPoolExecutor(max_workers=Config.CANDLE_FETCH_WORKERS) as executor:
+            futures = {
+                name: executor.submit(self.client.get_1h_closes, name, Config.EMA_PERIODS + 5)
+                for name in names
+            }
+        
+        candles_by_name = {}
+        for name, future in futures.items():
+            try:
+                candles_by_name[name] = future.result()
+            except Exception as e:
+                print(f"⚠️  Error fetching candles for {name}: {e}")
+                candles_by_name[name] = None
+        return candles_by_name
+    
+    def _check_momentum(self, token, volume_stats, candles, now_ms):
+        """Check if a volume spike token has positive momentum and send alert"""
+        name = token['name']
         
-        # STEP 2: Get candle data and analyze price momentum
-        candles = self.client.get_1h_candles(name, num_candles=Config.EMA_PERIODS + 5)
-        if not candles:
+        # Update price history and calculate EMA
+        if candles is not None:
+            timestamps, closes = candles
+            self.price_analyzer.update_prices(name, timestamps, closes)
+        elif self.price_analyzer.needs_candles(name, now_ms):
             print(f"⚠️  No candle data for {name}, skipping momentum analysis")
             return False
-        
-        # Update price history and calculate EMA
-        self.price_analyzer.update_prices(name, candles)
+        else:
+            # Warm EMA within the same 1H candle: advance it from the snapshot price
+            self.price_analyzer.update_current_price(name, token['price'])
         
         if not self.price_analyzer.has_sufficient_data(name):
             return False
         
-        ema_stats = self.price_analyzer.calculate_ema(name)
+        ema_stats = self.price_analyzer.calculate_ema(name, require_above_ema=Config.PRICE_ABOVE_EMA_REQUIRED)
         if not ema_stats:
             return False
         
-        # STEP 3: Check momentum filters
+        # Check momentum filters
         momentum_conditions = []
         
         # Required: Price above EMA
@@ -113,7 +126,7 @@ class VolumeSpikeBot:
                 return False  # EMA not rising, reject signal
             momentum_conditions.append("EMA Rising")
         
-        # STEP 4: Send alert with combined data
+        # Send alert with combined data
         alert_data = {
             **token,           # Original token data
             **volume_stats,    # Volume spike statistics  
@@ -138,27 +151,32 @@ class VolumeSpikeBot:
         filtered_tokens = self._filter_tokens(tokens)
         
         # Show filtering info
-        config = Config()
         if Config.STRICT_LIST_ENABLED:
-            strict_count = len(config.STRICT_LIST)
+            strict_count = len(self._strict_list)
             print(f"📋 Strict list: {strict_count} tokens | Analyzing: {len(filtered_tokens)} tokens (volume + momentum)")
         else:
             print(f"📊 Analyzing {len(filtered_tokens)} tokens (volume + momentum)...")
         
-        # Check each token for volume spikes AND momentum
         alerts_sent = 0
         start_time = time.time()
         
-        for i, token in enumerate(filtered_tokens):
+        # STEP 1: Volume spike pass across all tokens (no network calls)
+        spikes = self._find_volume_spikes(filtered_tokens)
+        
+        # STEP 2: Fetch candles concurrently, only for spike tokens whose EMA is cold
+        # or whose 1H candle has rolled over; the rest reuse the universe snapshot price
+        now_ms = int(time.time() * 1000)
+        candle_names = [token['name'] for token, _ in spikes
+                        if self.price_analyzer.needs_candles(token['name'], now_ms)]
+        if candle_names:
+            print(f"📥 Fetching candles for {len(candle_names)}/{len(spikes)} volume spike tokens...")
+        candles_by_name = self._fetch_candles(candle_names)
+        
+        # STEP 3: Momentum confirmation and alerts
+        for token, volume_stats in spikes:
             try:
-                if self._check_volume_and_momentum_spike(token):
+                if self._check_momentum(token, volume_stats, candles_by_name.get(token['name']), now_ms):
                     alerts_sent += 1
-                
-                # Progress indicator every 25 tokens (adjusted for smaller lists)
-                if (i + 1) % 25 == 0:
-                    elapsed = time.time() - start_time
-                    print(f"📈 Processed {i + 1}/{len(filtered_tokens)} tokens ({elapsed:.1f}s elapsed)")
-                    
             except Exception as e:
                 print(f"⚠️  Error analyzing {token['name']}: {e}")
                 continue
@@ -175,7 +193,6 @@ class VolumeSpikeBot:
         """Main bot loop"""
         print("🚀 Hyperliquid Volume Spike + Momentum Bot Starting...")
         
-        config = Config()
         config_summary = (
             f"⚙️  Volume: σ≥{Config.SIGMA_THRESHOLD}, Z≥{Config.Z_SCORE_THRESHOLD}, {Config.VOLUME_PERIODS} periods\n"
             f"📈 Momentum: {Config.EMA_PERIODS}-EMA, Price>EMA: {Config.PRICE_ABOVE_EMA_REQUIRED}, "
@@ -183,8 +200,7 @@ class VolumeSpikeBot:
         )
         
         if Config.STRICT_LIST_ENABLED:
-            strict_list = config.STRICT_LIST
-            config_summary += f"📋 Strict list: {len(strict_list)} tokens enabled\n"
+            config_summary += f"📋 Strict list: {len(self._strict_list)} tokens enabled\n"
         else:
             config_summary += f"📊 Monitoring: All available tokens\n"
             
@@ -1,47 +1,130 @@
 import numpy as np
-from typing import List, Dict, Optional
-from collections import defaultdict, deque
+from typing import Dict, Optional
+
+try:
+    import numba
+except ImportError:  # Optional: speeds up the cold-start EMA recurrence
+    numba = None
+
+def _ema_recurrence(prices: np.ndarray, alpha: float, seed: float) -> float:
+    """Run EMA[t] = α × Price[t] + (1-α) × EMA[t-1] over prices, starting from seed"""
+    ema = seed
+    for price in prices:
+        ema = alpha * price + (1 - alpha) * ema
+    return ema
+
+if numba is not None:
+    _ema_recurrence = numba.njit(cache=True)(_ema_recurrence)
+
+CANDLE_INTERVAL_MS = 60 * 60 * 1000  # 1H candles
 
 class PriceAnalyzer:
     def __init__(self, ema_periods: int = 21):
         self.ema_periods = ema_periods
-        self.price_history = defaultdict(lambda: deque(maxlen=ema_periods + 5))  # Extra buffer
-        self.ema_history = defaultdict(lambda: deque(maxlen=5))  # Store last 5 EMA values for slope
+        self.price_history: Dict[str, np.ndarray] = {}  # Last ema_periods + 5 closes (extra buffer)
+        self._ema_tail: Dict[str, tuple] = {}  # Last 3 EMA values per token for slope
+        self._alpha = 2 / (ema_periods + 1)
+        # EMA weight vectors keyed by len(prices), precomputed for every price window length
+        self._weights_cache: Dict[int, np.ndarray] = {
+            n: self._ema_weights(n) for n in range(ema_periods, ema_periods + 6)
+        }
+        
+        # Streaming EMA state: the newest candle is still forming, so we keep the EMA
+        # up to the previous candle as a base and fold the newest close on top of it
+        self.last_ema: Dict[str, float] = {}
+        self.last_ts: Dict[str, int] = {}
+        self.seeded: set = set()
+        self._ema_base: Dict[str, float] = {}
     
-    def update_prices(self, token: str, candles: List[Dict]) -> None:
-        """Update price history with new candle data"""
-        if not candles:
+    def update_prices(self, token: str, timestamps: np.ndarray, closes: np.ndarray) -> None:
+        """Update price history with new candle timestamps and closes (oldest first)"""
+        if len(closes) == 0:
             return
         
-        # Sort candles by timestamp to ensure chronological order
-        sorted_candles = sorted(candles, key=lambda x: x['timestamp'])
+        # Candles arrive in chronological order (HyperliquidClient.get_1h_closes guarantees it).
+        # Keep only the price window so the EMA seed and price_history cover the same candles.
+        window = self.ema_periods + 5
+        timestamps, closes = timestamps[-window:], closes[-window:]
+        self.price_history[token] = closes
         
-        # Clear existing data and add all candles
-        self.price_history[token].clear()
-        for candle in sorted_candles:
-            self.price_history[token].append(candle['close'])
+        self._update_ema(token, timestamps, closes)
+    
+    def needs_candles(self, token: str, now_ms: int) -> bool:
+        """Check if token needs a candle fetch (cold start, or its forming 1H candle has closed)"""
+        if token not in self.seeded:
+            return True
+        return now_ms - now_ms % CANDLE_INTERVAL_MS != self.last_ts[token]
     
-    def calculate_ema(self, token: str) -> Optional[Dict]:
-        """Calculate EMA and related metrics"""
-        prices = list(self.price_history[token])
+    def update_current_price(self, token: str, price: float) -> None:
+        """Update the forming candle's close from a live price, without fetching candles
         
-        if len(prices) < 5:  # Need minimum data
+        Only valid while needs_candles() is False.
+        """
+        self.price_history[token][-1] = price
+        self.last_ema[token] = self._alpha * price + (1 - self._alpha) * self._ema_base[token]
+    
+    def _update_ema(self, token: str, timestamps: np.ndarray, closes: np.ndarray) -> None:
+        """Advance the streaming EMA, falling back to a full recompute on gaps or backfills"""
+        alpha = self._alpha
+        
+        if token in self.seeded:
+            # Warm path: resume from the candle that was still forming last time
+            start = int(np.searchsorted(timestamps, self.last_ts[token]))
+            if start < len(timestamps) and timestamps[start] == self.last_ts[token]:
+                ema = _ema_recurrence(closes[start:-1], alpha, self._ema_base[token])
+                self._ema_base[token] = float(ema)
+                self.last_ema[token] = alpha * float(closes[-1]) + (1 - alpha) * ema
+                self.last_ts[token] = int(timestamps[-1])
+                return
+        
+        # Cold path: seed with the SMA of the first period and run the tail once
+        self.seeded.discard(token)
+        self.last_ema.pop(token, None)
+        if len(closes) <= self.ema_periods:
+            return  # Not enough candles to seed; calculate_ema falls back to the price window
+        
+        self._ema_base[token] = self._calculate_ema_21(closes[:-1])
+        self.last_ema[token] = alpha * float(closes[-1]) + (1 - alpha) * self._ema_base[token]
+        self.last_ts[token] = int(timestamps[-1])
+        self.seeded.add(token)
+    
+    def calculate_ema(self, token: str, require_above_ema: bool = False) -> Optional[Dict]:
+        """Calculate EMA and related metrics
+        
+        With require_above_ema, returns only {current_price, ema_value, price_above_ema}
+        when price is not above EMA, skipping the slope check.
+        """
+        price_history = self.price_history.get(token)
+        
+        if price_history is None or len(price_history) < 5:  # Need minimum data
             return None
         
-        current_price = prices[-1]
+        current_price = float(price_history[-1])
         
         # Calculate EMA or SMA based on available data
-        if len(prices) >= self.ema_periods:
+        if token in self.seeded:
+            # Use streaming EMA maintained by update_prices
+            ema_value = self.last_ema[token]
+            method = "EMA"
+        elif len(price_history) >= self.ema_periods:
             # Use EMA calculation
-            ema_value = self._calculate_ema_21(prices)
+            ema_value = self._calculate_ema_21(price_history)
             method = "EMA"
         else:
             # Fallback to Simple Moving Average
-            ema_value = np.mean(prices)
+            ema_value = float(np.mean(price_history))
             method = "SMA"
         
         # Store EMA value for slope calculation
-        self.ema_history[token].append(ema_value)
+        self._ema_tail[token] = self._ema_tail.get(token, ())[-2:] + (ema_value,)
+        
+        price_above_ema = current_price > ema_value
+        if require_above_ema and not price_above_ema:
+            return {
+                "current_price": current_price,
+                "ema_value": ema_value,
+                "price_above_ema": False
+            }
         
         # Calculate EMA slope if we have enough EMA history
         ema_slope_up = self._is_ema_sloping_up(token)
@@ -49,45 +132,62 @@ class PriceAnalyzer:
         return {
             "current_price": current_price,
             "ema_value": ema_value,
-            "price_above_ema": current_price > ema_value,
+            "price_above_ema": price_above_ema,
             "ema_slope_up": ema_slope_up,
             "method": method,
-            "periods_used": len(prices)
+            "periods_used": len(price_history)
         }
     
-    def _calculate_ema_21(self, prices: List[float]) -> float:
+    def _calculate_ema_21(self, prices: np.ndarray) -> float:
         """Calculate 21-period Exponential Moving Average"""
         if len(prices) < self.ema_periods:
             return np.mean(prices)  # Fallback to SMA
         
-        # EMA formula: EMA[t] = α × Price[t] + (1-α) × EMA[t-1]
-        alpha = 2 / (self.ema_periods + 1)  # 2/(21+1) = 0.0909
-        
-        # Initialize EMA with Simple Moving Average of first period
-        ema = np.mean(prices[:self.ema_periods])
-        
-        # Calculate EMA for remaining periods
-        for price in prices[self.ema_periods:]:
-            ema = alpha * price + (1 - alpha) * ema
-        
-        return ema
+        if numba is not None:
+            # Compiled recurrence seeded with the SMA of the first period; when numba is
+            # installed this replaces the precomputed-weight dot product below
+            prices = np.asarray(prices, dtype=np.float64)
+            seed = prices[:self.ema_periods].mean()
+            return float(_ema_recurrence(prices[self.ema_periods:], self._alpha, seed))
+        
+        # EMA[t] = α × Price[t] + (1-α) × EMA[t-1], seeded with the SMA of the first period,
+        # unrolled into a single dot product with a precomputed weight vector
+        weights = self._weights_cache.get(len(prices))
+        if weights is None:  # Not a price window length (e.g. called with a longer series)
+            weights = self._ema_weights(len(prices))
+            self._weights_cache[len(prices)] = weights
+        
+        return float(np.dot(weights, np.asarray(prices, dtype=np.float64)))
+    
+    def _ema_weights(self, n: int) -> np.ndarray:
+        """Build weights so that weights · prices equals the SMA-seeded EMA recurrence"""
+        alpha = self._alpha
+        tail = n - self.ema_periods  # Prices folded in after the SMA seed
+        
+        weights = np.empty(n, dtype=np.float64)
+        # Seed prices each contribute (1-α)^tail / ema_periods via the SMA
+        weights[:self.ema_periods] = (1 - alpha) ** tail / self.ema_periods
+        # Later prices decay geometrically: α(1-α)^(tail-1), ..., α(1-α), α
+        weights[self.ema_periods:] = alpha * (1 - alpha) ** np.arange(tail - 1, -1, -1)
+        return weights
     
     def _is_ema_sloping_up(self, token: str) -> Optional[bool]:
         """Check if EMA is sloping upward based on last 3 values"""
-        ema_values = list(self.ema_history[token])
+        ema_tail = self._ema_tail.get(token, ())
         
-        if len(ema_values) < 3:
+        if len(ema_tail) < 3:
             return None  # Not enough data for slope calculation - unknown
         
         # Check if last 3 EMA values are strictly increasing
-        is_upward = ema_values[-3] < ema_values[-2] < ema_values[-1]
+        a, b, c = ema_tail
+        is_upward = a < b < c
         
         # Return True if upward, None if not upward (unknown)
         return True if is_upward else None
     
     def has_sufficient_data(self, token: str) -> bool:
         """Check if token has enough data for EMA analysis"""
-        return len(self.price_history[token]) >= 5
+        return len(self.price_history.get(token, ())) >= 5
     
     def get_analysis_summary(self, token: str) -> Optional[str]:
         """Get human-readable analysis summary"""
@@ -7,12 +7,15 @@ Updates strict_list.json with tokens based on strict criteria
 import os
 import sys
 import json
-import requests
 from typing import List
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hyperliquid_client import HyperliquidClient
+
 class StrictListUpdater:
     def __init__(self):
         self.json_file = "strict_list.json"
+        self.client = HyperliquidClient()
         
     def get_current_strict_list(self) -> List[str]:
         """Get current strict list from JSON file"""
@@ -37,15 +40,12 @@ class StrictListUpdater:
         """Fetch tokens based on strict criteria from Hyperliquid API"""
         print("🔍 Fetching strict tokens from Hyperliquid API...")
         
-        url = "https://api.hyperliquid.xyz/info"
-        payload = {"type": "meta"}
-        headers = {"Content-Type": "application/json"}
+        data = self.client.get_meta()
+        if not data:
+            print("❌ Error fetching from Hyperliquid API")
+            return []
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-
             strict_tokens = []
             excluded_tokens = {"BTC", "ETH"}  # Exclude Bitcoin and Ethereum
             
@@ -66,12 +66,9 @@ class StrictListUpdater:
                     strict_tokens.append(token_name)
 
             print(f"📊 Found {len(strict_tokens)} tokens meeting strict criteria (excluding BTC/ETH)")
-            return sorted(strict_tokens)
+            return sorted(set(strict_tokens))  # Unique names; Config loads them into a frozenset
             
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching from Hyperliquid API: {e}")
-            return []
-        except (KeyError, json.JSONDecodeError) as e:
+        except (KeyError, TypeError) as e:
             print(f"❌ Error parsing API response: {e}")
             return []
     
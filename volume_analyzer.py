@@ -1,51 +1,116 @@
 import numpy as np
 from typing import List, Dict, Optional
-from collections import defaultdict, deque
 
 class VolumeAnalyzer:
-    def __init__(self, periods: int = 20):
+    def __init__(self, periods: int = 20, capacity: int = 256):
         self.periods = periods
-        self.volume_history = defaultdict(lambda: deque(maxlen=periods))
+        
+        # One ring-buffer row per token in a shared matrix so stats for every
+        # token are computed in a single vectorized pass
+        self._row: Dict[str, int] = {}
+        self._matrix = np.zeros((capacity, periods), dtype=np.float64)
+        self._ptr = np.zeros(capacity, dtype=np.int64)  # Next write slot per row
+        self._len = np.zeros(capacity, dtype=np.int64)  # Samples stored per row
+        
+        # Running sums over each row so stats are O(1) per token
+        self.sum = np.zeros(capacity, dtype=np.float64)
+        self.sumsq = np.zeros(capacity, dtype=np.float64)
+    
+    def _rows(self, tokens: List[str]) -> np.ndarray:
+        """Map token names to matrix rows, assigning (and growing) rows for new tokens"""
+        for token in tokens:
+            if token not in self._row:
+                if len(self._row) == len(self._matrix):
+                    self._grow()
+                self._row[token] = len(self._row)
+        return np.fromiter((self._row[token] for token in tokens), dtype=np.int64, count=len(tokens))
+    
+    def _grow(self) -> None:
+        """Double row capacity"""
+        extra = len(self._matrix)
+        self._matrix = np.vstack([self._matrix, np.zeros((extra, self.periods))])
+        self._ptr = np.concatenate([self._ptr, np.zeros(extra, dtype=np.int64)])
+        self._len = np.concatenate([self._len, np.zeros(extra, dtype=np.int64)])
+        self.sum = np.concatenate([self.sum, np.zeros(extra)])
+        self.sumsq = np.concatenate([self.sumsq, np.zeros(extra)])
     
     def update_volume(self, token: str, volume: float) -> None:
         """Update volume history for a token"""
-        self.volume_history[token].append(volume)
-    
-    def calculate_stats(self, token: str, current_volume: float) -> Optional[Dict]:
-        """Calculate sigma deviation and Z-score for current volume"""
-        history = list(self.volume_history[token])
+        row = self._row.get(token)
+        if row is None:
+            row = int(self._rows([token])[0])
         
-        # Need at least 5 periods for meaningful statistics
-        if len(history) < 5:
-            return None
+        # Write straight into the token's ring-buffer row
+        buf = self._matrix[row]
+        ptr = self._ptr[row]
+        if self._len[row] == self.periods:
+            evicted = buf[ptr]
+            self.sum[row] -= evicted
+            self.sumsq[row] -= evicted * evicted
+        else:
+            self._len[row] += 1
         
-        # Use historical data (excluding current) for baseline
-        baseline_volumes = np.array(history[:-1] if len(history) == self.periods else history)
+        buf[ptr] = volume
+        self.sum[row] += volume
+        self.sumsq[row] += volume * volume
+        self._ptr[row] = (ptr + 1) % self.periods
+    
+    def update_volumes(self, tokens: List[str], volumes: np.ndarray) -> None:
+        """Update volume history for several (distinct) tokens at once"""
+        rows = self._rows(tokens)
+        ptr = self._ptr[rows]
         
-        if len(baseline_volumes) == 0:
-            return None
+        # Evict the oldest sample from full windows
+        evicted = np.where(self._len[rows] == self.periods, self._matrix[rows, ptr], 0.0)
+        self.sum[rows] += volumes - evicted
+        self.sumsq[rows] += volumes * volumes - evicted * evicted
         
-        mean_volume = np.mean(baseline_volumes)
-        std_volume = np.std(baseline_volumes)
+        self._matrix[rows, ptr] = volumes
+        self._ptr[rows] = (ptr + 1) % self.periods
+        self._len[rows] = np.minimum(self._len[rows] + 1, self.periods)
+    
+    def calculate_stats(self, token: str, current_volume: float) -> Optional[Dict]:
+        """Calculate sigma deviation and Z-score for current volume"""
+        return self.calculate_stats_batch([token], np.array([current_volume], dtype=np.float64)).get(token)
+    
+    def calculate_stats_batch(self, tokens: List[str], current_volumes: np.ndarray) -> Dict[str, Dict]:
+        """Calculate sigma deviation and Z-score for several tokens in one vectorized pass
         
-        # Avoid division by zero
-        if std_volume == 0:
-            return None
+        Returns stats only for tokens with enough data and non-zero spread.
+        """
+        rows = self._rows(tokens)
+        lengths = self._len[rows]
         
-        # Sigma deviation: how many standard deviations above mean
-        sigma_dev = (current_volume - mean_volume) / std_volume
+        # Use historical data (excluding current) for baseline
+        full = lengths == self.periods
+        latest = self._matrix[rows, (self._ptr[rows] - 1) % self.periods]
+        counts = lengths - full
+        totals = self.sum[rows] - np.where(full, latest, 0.0)
+        totals_sq = self.sumsq[rows] - np.where(full, latest * latest, 0.0)
         
-        # Z-score: standardized score (same calculation in this case)
-        z_score = sigma_dev
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_volumes = totals / counts
+            variances = totals_sq / counts - mean_volumes * mean_volumes
+            
+            # Need at least 5 periods for meaningful statistics, and non-zero spread
+            # (treating float residue from the running sums as zero)
+            valid = (lengths >= 5) & (counts > 0) & (variances > 1e-12 * mean_volumes * mean_volumes)
+            
+            # Sigma deviation: how many standard deviations above mean
+            sigma_devs = (current_volumes - mean_volumes) / np.sqrt(variances)
         
-        return {
-            "sigma_deviation": sigma_dev,
-            "z_score": z_score,
-            "mean_volume": mean_volume,
-            "current_volume": current_volume,
-            "periods_analyzed": len(baseline_volumes)
-        }
+        stats = {}
+        for i in np.flatnonzero(valid):
+            stats[tokens[i]] = {
+                "sigma_deviation": float(sigma_devs[i]),
+                "z_score": float(sigma_devs[i]),  # Z-score: standardized score (same calculation in this case)
+                "mean_volume": float(mean_volumes[i]),
+                "current_volume": float(current_volumes[i]),
+                "periods_analyzed": int(counts[i])
+            }
+        return stats
     
     def has_sufficient_data(self, token: str) -> bool:
         """Check if token has enough data for analysis"""
-        return len(self.volume_history[token]) >= 5 
\ No newline at end of file
+        row = self._row.get(token)
+        return row is not None and self._len[row] >= 5